@@ -0,0 +1,97 @@
+"""
+_zigzag.pyx
+
+Optional compiled ZigZag kernel, same state machine as _zigzag_core in
+elliott_wave_analyzer.py. Used instead of the numba kernel when built.
+
+Build:
+    pip install cython
+    python setup.py build_ext --inplace
+"""
+
+from cython cimport floating
+from libc.stdint cimport int8_t, int64_t
+
+import numpy as np
+
+
+cpdef tuple zigzag_core(const floating[::1] vals, double pct):
+    """
+    ZigZag state machine on a float32 or float64 array, ratios are
+    computed in double precision. pct must be > 0.
+    Returns the integer positions and directions of all swing points,
+    including the first bar and the trailing last bar.
+    """
+    cdef Py_ssize_t i, n = vals.shape[0]
+    cdef Py_ssize_t count = 1
+    cdef Py_ssize_t running_high_i = 0, running_low_i = 0
+    cdef double price, running_high, running_low, last_pivot_price
+    cdef double change, down_change, up_change
+    cdef int direction = 0  # 0 unknown, +1 up, -1 down
+
+    # The buffers hold one pivot per bar, with pct <= 0 a bar can commit two
+    if not pct > 0:
+        raise ValueError(f"ZigZag threshold must be positive, got {pct}")
+    if n == 0:
+        return np.empty(0, np.int64), np.empty(0, np.int8)
+
+    pivot_idx_arr = np.empty(n + 1, np.int64)
+    pivot_dir_arr = np.empty(n + 1, np.int8)
+    cdef int64_t[::1] pivot_idx = pivot_idx_arr
+    cdef int8_t[::1] pivot_dir = pivot_dir_arr
+
+    with nogil:
+        pivot_idx[0] = 0
+        pivot_dir[0] = 0
+
+        last_pivot_price = vals[0]
+
+        # Running extrema since the last pivot, reset whenever a pivot is committed.
+        running_high = running_low = last_pivot_price
+
+        for i in range(1, n):
+            price = vals[i]
+            if price > running_high:
+                running_high = price
+                running_high_i = i
+            if price < running_low:
+                running_low = price
+                running_low_i = i
+
+            if direction >= 0:
+                down_change = (price - running_high) / running_high
+                if direction == 0:
+                    change = (price - last_pivot_price) / last_pivot_price
+                    if (change if change >= 0 else -change) >= pct:
+                        direction = 1 if change > 0 else -1
+                elif direction == 1 and down_change <= -pct:
+                    pivot_idx[count] = running_high_i
+                    pivot_dir[count] = 1
+                    count += 1
+                    last_pivot_price = running_high
+                    running_high = running_low = price
+                    running_high_i = running_low_i = i
+                    direction = -1
+
+            if direction <= 0:
+                up_change = (price - running_low) / running_low if running_low != 0 else 0.0
+                if direction == 0:
+                    change = (price - last_pivot_price) / last_pivot_price
+                    if (change if change >= 0 else -change) >= pct:
+                        direction = 1 if change > 0 else -1
+                elif direction == -1 and up_change >= pct:
+                    pivot_idx[count] = running_low_i
+                    pivot_dir[count] = -1
+                    count += 1
+                    last_pivot_price = running_low
+                    running_high = running_low = price
+                    running_high_i = running_low_i = i
+                    direction = 1
+
+        # Pivots are always committed before the current bar, only a single bar series repeats it
+        if pivot_idx[count - 1] != n - 1:
+            pivot_idx[count] = n - 1
+            pivot_dir[count] = direction
+            count += 1
+
+    return pivot_idx_arr[:count], pivot_dir_arr[:count]
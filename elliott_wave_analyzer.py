@@ -13,7 +13,7 @@ Functions:
 - print a report and optionally plot
 
 Install:
-    pip install yfinance pandas numpy matplotlib
+    pip install yfinance pandas numpy matplotlib numba pyarrow joblib curl_cffi
 
 Example:
     python elliott_wave_analyzer.py --ticker AAPL --period 2y --interval 1d --zigzag 5
@@ -23,149 +23,498 @@ This is a heuristic tool for education. Elliott counting is interpretive.
 """
 
 import argparse
+import functools
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from datetime import date
 from typing import List, Tuple, Optional, Dict
 
+import joblib
 import numpy as np
 import pandas as pd
 import yfinance as yf
+from curl_cffi import requests as curl_requests
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
+from matplotlib.transforms import offset_copy
+
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:  # numba is optional, the kernels then run as plain Python
+    _HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+    prange = range
+
+try:
+    # Compiled kernel, built with: python setup.py build_ext --inplace
+    from _zigzag import zigzag_core as _zigzag_core_c
+except ImportError:
+    _zigzag_core_c = None
+
+DEFAULT_CACHE_DIR = os.path.expanduser("~/.cache/ewa")
+INTRADAY_CACHE_TTL = 15 * 60  # seconds
+ZIGZAG_CACHE_BYTES = 64 * 1024 * 1024  # size limit of the ZigZag cache
+
+# Waves 1-5 and A-C as a bitmask, one bit per move, 1 for up, wave 1 first
+_UP_MASK = 0b1010101
+_DOWN_MASK = 0b0101010
+
+FIB_LABELS = ("0.236", "0.382", "0.5", "0.618", "0.786", "1.0")
+_FIB_RATIOS = np.array([0.236, 0.382, 0.5, 0.618, 0.786, 1.0], dtype=np.float64)
+
+# Below this length the plain Python loop beats the NumPy scan of _zigzag_core_numpy
+_NUMPY_SCAN_MIN_BARS = 20_000
 
 
 @dataclass
-class Swing:
-    idx: pd.Timestamp
-    price: float
-    direction: int  # +1 up, -1 down
+class Swings:
+    """
+    ZigZag swing points as parallel arrays.
+    Slicing returns a Swings view over the same arrays.
+    """
+    idx: pd.Index  # pivot timestamps
+    price: np.ndarray  # float64
+    direction: np.ndarray  # int8, +1 up, -1 down, 0 unknown
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    def __getitem__(self, key: slice) -> "Swings":
+        return Swings(self.idx[key], self.price[key], self.direction[key])
+
+
+def _is_intraday(interval: str) -> bool:
+    return interval.endswith(("m", "h"))
+
+
+def _cache_path(cache_dir: str, ticker: str, period: str, interval: str) -> str:
+    return os.path.join(cache_dir, f"{ticker}_{period}_{interval}_{date.today():%Y%m%d}.parquet")
+
+
+def _read_cache(path: str, interval: str) -> Optional[pd.DataFrame]:
+    if os.path.exists(path) and (not _is_intraday(interval) or time.time() - os.path.getmtime(path) < INTRADAY_CACHE_TTL):
+        return pd.read_parquet(path)
+    return None
+
+
+def _write_cache(df: pd.DataFrame, path: str) -> None:
+    # Write to a temporary file first so concurrent readers never see a partial file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp)
+    os.replace(tmp, path)
+
+
+def make_session() -> curl_requests.Session:
+    """
+    HTTP session for yfinance downloads.
+    Reusing one session keeps the TLS connection to Yahoo open between requests.
+    yfinance only accepts curl_cffi sessions, not requests.Session.
+    """
+    return curl_requests.Session(impersonate="chrome")
 
 
-def fetch_data(ticker: str, period: str = "2y", interval: str = "1d") -> pd.DataFrame:
-    df = yf.download(ticker, period=period, interval=interval, progress=False)
+def fetch_data(ticker: str, period: str = "2y", interval: str = "1d", cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+               session: Optional[curl_requests.Session] = None) -> pd.DataFrame:
+    """
+    Download prices from Yahoo Finance.
+    Downloads are cached as parquet files in cache_dir, keyed on today's date,
+    intraday data additionally expires after INTRADAY_CACHE_TTL seconds.
+    Pass cache_dir=None to always download.
+    """
+    path = None
+    if cache_dir:
+        path = _cache_path(cache_dir, ticker, period, interval)
+        cached = _read_cache(path, interval)
+        if cached is not None:
+            return cached
+
+    df = yf.download(ticker, period=period, interval=interval, progress=False, session=session)
     if df.empty:
         raise RuntimeError(f"No data for {ticker}")
     
     # Handle multi-level columns if present
     if isinstance(df.columns, pd.MultiIndex):
         df.columns = df.columns.droplevel(1)
+
+    if path:
+        _write_cache(df, path)
     
     return df
 
 
-def zigzag(prices: pd.Series, pct: float = 5.0) -> List[Swing]:
+def fetch_many(tickers: List[str], period: str = "2y", interval: str = "1d",
+               cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+               session: Optional[curl_requests.Session] = None) -> Dict[str, pd.DataFrame]:
     """
-    Very simple ZigZag on close prices.
-    pct is the minimum percent reversal per swing.
+    Download several tickers with the same period and interval in one
+    yf.download call. Cached tickers are read from disk like in fetch_data.
+    Tickers without data are missing from the returned dict, as are
+    entries that are not a single symbol (non strings, empty or with spaces).
     """
-    if prices.empty:
-        return []
+    frames: Dict[str, pd.DataFrame] = {}
+    missing = []
+    for ticker in dict.fromkeys(tickers):
+        # A bad entry would fail the joined request of the whole group
+        if not isinstance(ticker, str) or ticker.split() != [ticker]:
+            continue
+        cached = _read_cache(_cache_path(cache_dir, ticker, period, interval), interval) if cache_dir else None
+        if cached is not None:
+            frames[ticker] = cached
+        else:
+            missing.append(ticker)
+
+    if not missing:
+        return frames
+
+    big = yf.download(" ".join(missing), period=period, interval=interval, group_by="ticker", progress=False, threads=True,
+                      session=session)
+    for ticker in missing:
+        if isinstance(big.columns, pd.MultiIndex):
+            # yf.download upper-cases the symbols, the result keeps the caller's spelling
+            symbol = ticker.upper()
+            if symbol not in big.columns.get_level_values(0):
+                continue
+            df = big[symbol]
+        else:
+            df = big
+
+        # Tickers share one index in the batch, drop the rows that only exist for others
+        df = df.dropna(how="all")
+        if df.empty:
+            continue
+        frames[ticker] = df
+        if cache_dir:
+            _write_cache(df, _cache_path(cache_dir, ticker, period, interval))
+
+    return frames
+
+
+@njit(cache=True, nogil=True)
+def _zigzag_core(vals: np.ndarray, pct: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    ZigZag state machine on a float array, pct must be > 0.
+    The running extrema restart at the bar that confirms a pivot, so with
+    pct <= 0 the result would differ from rescanning from the pivot on.
+    Returns the integer positions and directions of all swing points,
+    including the first bar and the trailing last bar.
+    """
+    n = len(vals)
+    pivot_idx = np.empty(n + 1, np.int64)
+    pivot_dir = np.empty(n + 1, np.int8)
+    pivot_idx[0] = 0
+    pivot_dir[0] = 0
+    count = 1
 
-    pct = pct / 100.0
-    idxs = prices.index
-    last_pivot_price = float(prices.iloc[0])
-    last_pivot_idx = idxs[0]
+    # Ratios are computed in float64 whatever the input dtype
+    last_pivot_price = np.float64(vals[0])
 
-    direction = 0  # 0 unknown, +1 up, -1 down
-    swings: List[Swing] = [Swing(last_pivot_idx, last_pivot_price, 0)]
+    # Running extrema since the last pivot, reset whenever a pivot is committed.
+    running_high = running_low = last_pivot_price
+    running_high_i = running_low_i = 0
 
-    for i in range(1, len(prices)):
-        price = float(prices.iloc[i])
-        idx = idxs[i]
+    direction = 0  # 0 unknown, +1 up, -1 down
+    for i in range(1, n):
+        price = np.float64(vals[i])
+        if price > running_high:
+            running_high, running_high_i = price, i
+        if price < running_low:
+            running_low, running_low_i = price, i
 
         if direction >= 0:
-            high_since = float(prices.loc[last_pivot_idx:idx].max())
-            down_change = (price - high_since) / high_since
+            down_change = (price - running_high) / running_high
             if direction == 0:
                 change = (price - last_pivot_price) / last_pivot_price
                 if abs(change) >= pct:
                     direction = 1 if change > 0 else -1
             elif direction == 1 and down_change <= -pct:
-                pivot_idx = prices.loc[last_pivot_idx:idx].idxmax()
-                pivot_price = float(prices.loc[pivot_idx])
-                swings.append(Swing(pivot_idx, pivot_price, +1))
-                last_pivot_idx, last_pivot_price = pivot_idx, pivot_price
+                pivot_idx[count] = running_high_i
+                pivot_dir[count] = 1
+                count += 1
+                last_pivot_price = running_high
+                running_high = running_low = price
+                running_high_i = running_low_i = i
                 direction = -1
 
         if direction <= 0:
-            low_since = float(prices.loc[last_pivot_idx:idx].min())
-            up_change = (price - low_since) / low_since if low_since != 0 else 0.0
+            up_change = (price - running_low) / running_low if running_low != 0 else 0.0
             if direction == 0:
                 change = (price - last_pivot_price) / last_pivot_price
                 if abs(change) >= pct:
                     direction = 1 if change > 0 else -1
             elif direction == -1 and up_change >= pct:
-                pivot_idx = prices.loc[last_pivot_idx:idx].idxmin()
-                pivot_price = float(prices.loc[pivot_idx])
-                swings.append(Swing(pivot_idx, pivot_price, -1))
-                last_pivot_idx, last_pivot_price = pivot_idx, pivot_price
+                pivot_idx[count] = running_low_i
+                pivot_dir[count] = -1
+                count += 1
+                last_pivot_price = running_low
+                running_high = running_low = price
+                running_high_i = running_low_i = i
                 direction = +1
 
-    swings.append(Swing(prices.index[-1], float(prices.iloc[-1]), direction))
+    # Pivots are always committed before the current bar, only a single bar series repeats it
+    if pivot_idx[count - 1] != n - 1:
+        pivot_idx[count] = n - 1
+        pivot_dir[count] = direction
+        count += 1
+    return pivot_idx[:count], pivot_dir[:count]
 
-    cleaned: List[Swing] = []
-    for s in swings:
-        if not cleaned or s.idx != cleaned[-1].idx:
-            cleaned.append(s)
-    return cleaned
+
+def _find_reversal(vals: np.ndarray, p0: int, start: int, pct: float, direction: int) -> Tuple[int, int]:
+    """
+    Find the first bar from start on that reverses by pct against the running
+    extreme of vals[p0:], the high for direction +1 and the low for -1.
+    Returns (bar, position of the extreme), or (-1, -1) if there is none.
+    Scans in growing chunks so a segment costs O(length) in NumPy, the
+    extreme's position is recovered from the accumulated array.
+    """
+    n = len(vals)
+    head = vals[p0:start]
+    carry_i = p0 + int(np.argmax(head) if direction > 0 else np.argmin(head))
+    carry = vals[carry_i]
+
+    pos, width = start, 64
+    while pos < n:
+        chunk = vals[pos:pos + width]
+        if direction > 0:
+            ext = np.maximum(np.maximum.accumulate(chunk), carry)
+            hits = np.flatnonzero((chunk - ext) / ext <= -pct)
+        else:
+            ext = np.minimum(np.minimum.accumulate(chunk), carry)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                up_change = np.where(ext != 0, (chunk - ext) / ext, 0.0)
+            hits = np.flatnonzero(up_change >= pct)
+
+        end = hits[0] if len(hits) else len(chunk) - 1
+        if ext[end] != carry:
+            # ext is monotonic, so the first bar at the new extreme is found by bisection
+            carry = ext[end]
+            if direction > 0:
+                carry_i = pos + int(np.searchsorted(ext, carry, side="left"))
+            else:
+                carry_i = pos + len(ext) - int(np.searchsorted(ext[::-1], carry, side="right"))
+        if len(hits):
+            return pos + int(end), carry_i
+
+        pos += width
+        width *= 2
+    return -1, -1
+
+
+def _zigzag_core_numpy(vals: np.ndarray, pct: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Same result as _zigzag_core, used when numba is not installed.
+    Instead of a Python loop per bar, each segment between pivots is scanned
+    with np.maximum.accumulate / np.minimum.accumulate. This only pays off on
+    long series with few pivots per bar, shorter ones use the plain loop.
+    """
+    if pct <= 0 or len(vals) < _NUMPY_SCAN_MIN_BARS:
+        # Degenerate threshold or short series, use the plain loop
+        return _zigzag_core(vals, pct)
+
+    # Ratios are computed in float64 like in the numba kernel
+    vals = vals.astype(np.float64, copy=False)
+
+    n = len(vals)
+    pivot_idx, pivot_dir = [0], [0]
+
+    direction = 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (vals[1:] - vals[0]) / vals[0]
+    first = np.flatnonzero(np.abs(change) >= pct)
+    if len(first):
+        direction = 1 if change[first[0]] > 0 else -1
+        p0, start = 0, int(first[0]) + 2
+        while True:
+            bar, pivot = _find_reversal(vals, p0, start, pct, direction)
+            if bar < 0:
+                break
+            pivot_idx.append(pivot)
+            pivot_dir.append(direction)
+            p0, start = bar, bar + 1
+            direction = -direction
+
+    if pivot_idx[-1] != n - 1:
+        pivot_idx.append(n - 1)
+        pivot_dir.append(direction)
+    return np.array(pivot_idx, dtype=np.int64), np.array(pivot_dir, dtype=np.int8)
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def _zigzag_batch(padded: np.ndarray, lens: np.ndarray, pcts: np.ndarray,
+                  out_idx: np.ndarray, out_dir: np.ndarray, out_n: np.ndarray) -> None:
+    """
+    Run _zigzag_core on every row of a NaN padded price matrix in parallel.
+    Row k holds lens[k] prices, its swing points are written to
+    out_idx[k, :out_n[k]] and out_dir[k, :out_n[k]].
+    """
+    for k in prange(padded.shape[0]):
+        if lens[k] == 0:
+            out_n[k] = 0
+            continue
+        pivot_idx, pivot_dir = _zigzag_core(padded[k, :lens[k]], pcts[k])
+        n = len(pivot_idx)
+        out_idx[k, :n] = pivot_idx
+        out_dir[k, :n] = pivot_dir
+        out_n[k] = n
+
+
+def _swings_from_pivots(prices: pd.Series, vals: np.ndarray, pivot_idx: np.ndarray, pivot_dir: np.ndarray) -> Swings:
+    return Swings(prices.index[pivot_idx], vals[pivot_idx], pivot_dir)
 
 
-def fib_levels(a: float, b: float) -> Dict[str, float]:
+def _zigzag_pivots(key: str, vals: np.ndarray, pct: float) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Common Fibonacci retracement levels between a and b.
+    Pivot positions and directions for float64 closes.
+    key is a digest of the closes, the joblib cache is keyed on it and pct
+    only, so it stays small and unchanged closes hit the cache whatever
+    their index or pandas metadata.
     """
-    diff = b - a
-    return {
-        "0.236": b - 0.236 * diff,
-        "0.382": b - 0.382 * diff,
-        "0.5": b - 0.5 * diff,
-        "0.618": b - 0.618 * diff,
-        "0.786": b - 0.786 * diff,
-        "1.0": a,
-    }
+    if _zigzag_core_c is not None:
+        return _zigzag_core_c(vals, pct)
+    return _zigzag_core(vals, pct) if _HAVE_NUMBA else _zigzag_core_numpy(vals, pct)
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_zigzag_pivots(cache_dir: str):
+    memory = joblib.Memory(os.path.join(cache_dir, "zigzag"), verbose=0)
+    # Trimmed once per process, least recently used entries go first
+    memory.reduce_size(bytes_limit=ZIGZAG_CACHE_BYTES)
+    return memory.cache(_zigzag_pivots, ignore=["vals"])
+
 
+def _check_pct(pct: float) -> None:
+    # The kernels size their pivot buffers for at most one pivot per bar, which only holds for pct > 0
+    if not pct > 0:
+        raise ValueError(f"ZigZag threshold must be a positive percent, got {pct}")
 
-def try_label_5_3(swings: List[Swing]) -> Dict[str, object]:
+
+def zigzag(prices: pd.Series, pct: float = 5.0, cache_dir: Optional[str] = None) -> Swings:
+    """
+    Very simple ZigZag on close prices.
+    pct is the minimum percent reversal per swing and must be > 0,
+    otherwise ValueError is raised.
+    With cache_dir, pivots are cached on disk keyed on the closes and pct.
+    A lookup costs more than the compiled kernels, the cache only pays off
+    when neither numba nor the Cython kernel is available.
+    """
+    _check_pct(pct)
+    if prices.empty:
+        return Swings(prices.index, np.empty(0, np.float64), np.empty(0, np.int8))
+
+    vals = prices.to_numpy(dtype=np.float64)
+    pivots = _cached_zigzag_pivots(cache_dir) if cache_dir else _zigzag_pivots
+    key = hashlib.blake2b(vals.data, digest_size=16).hexdigest()
+    pivot_idx, pivot_dir = pivots(key, vals, pct / 100.0)
+    return _swings_from_pivots(prices, vals, pivot_idx, pivot_dir)
+
+
+def zigzag_batch(series: List[pd.Series], pcts: List[float], cache_dir: Optional[str] = None) -> List[Swings]:
+    """
+    ZigZag for several close price series in a single parallel kernel call.
+    pcts holds the percent threshold per series.
+    With cache_dir each series goes through the disk cache of zigzag instead,
+    on a thread pool since the kernels release the GIL.
+    """
+    for pct in pcts:
+        _check_pct(pct)
+
+    if cache_dir:
+        with ThreadPoolExecutor() as executor:
+            return list(executor.map(zigzag, series, pcts, [cache_dir] * len(series)))
+
+    if not _HAVE_NUMBA:
+        return [zigzag(s, pct) for s, pct in zip(series, pcts)]
+
+    vals = [s.to_numpy(dtype=np.float64) for s in series]
+    lens = np.array([len(v) for v in vals], dtype=np.int64)
+    max_len = int(lens.max()) if len(vals) else 0
+
+    padded = np.full((len(vals), max_len), np.nan)
+    for k, v in enumerate(vals):
+        padded[k, :len(v)] = v
+
+    # One extra slot per row for the trailing last bar
+    out_idx = np.empty((len(vals), max_len + 1), np.int64)
+    out_dir = np.empty((len(vals), max_len + 1), np.int8)
+    out_n = np.empty(len(vals), np.int64)
+    _zigzag_batch(padded, lens, np.asarray(pcts, dtype=np.float64) / 100.0, out_idx, out_dir, out_n)
+
+    return [
+        _swings_from_pivots(s, v, out_idx[k, :out_n[k]], out_dir[k, :out_n[k]])
+        for k, (s, v) in enumerate(zip(series, vals))
+    ]
+
+
+def fib_levels(a, b) -> np.ndarray:
+    """
+    Common Fibonacci retracement levels between a and b, ordered as FIB_LABELS.
+    a and b may be scalars, giving shape (6,), or arrays of N swings, giving (N, 6).
+    Use dict(zip(FIB_LABELS, levels)) for a labelled view.
+    """
+    a = np.asarray(a, dtype=np.float64)[..., None]
+    b = np.asarray(b, dtype=np.float64)[..., None]
+    return b - _FIB_RATIOS * (b - a)
+
+
+@functools.lru_cache(maxsize=4096)
+def _label_core(prices: Tuple[float, ...]) -> Tuple[bool, Optional[str]]:
+    """
+    5 3 pattern check on the prices of the last eight pivots.
+    Returns (ok, trend), trend is None when it is unclear.
+    """
+    if prices[5] > prices[0]:
+        trend, pattern = "up", _UP_MASK
+    elif prices[5] < prices[0]:
+        trend, pattern = "down", _DOWN_MASK
+    else:
+        return False, None
+
+    # Pack the seven up moves into the high bits of a byte, flat moves never match
+    moves = np.diff(prices)
+    mask = int(np.packbits(moves > 0)[0]) >> 1
+    return bool(mask == pattern and np.count_nonzero(moves) == 7), trend
+
+
+def try_label_5_3(swings: Swings) -> Dict[str, object]:
     """
     Try to label the last swings as a 5 3 pattern.
     Heuristic: use the last eight pivot points and basic rules.
+    The check is cached on the pivot prices rounded to 6 decimals,
+    labels are only returned when the pattern matches.
     """
     if len(swings) < 8:
         return {"ok": False, "reason": "too few swings", "labels": []}
 
     pts = swings[-9:-1]
-    prices = [s.price for s in pts]
+    prices = pts.price
 
-    trend_up = prices[5] > prices[0]
-    trend_down = prices[5] < prices[0]
-    if not (trend_up or trend_down):
+    ok, trend = _label_core(tuple(np.round(prices, 6).tolist()))
+    if trend is None:
         return {"ok": False, "reason": "unclear trend", "labels": []}
-
-    ok_impulse = True
-    if trend_up:
-        ok_impulse &= prices[1] > prices[0] and prices[2] < prices[1] and prices[3] > prices[2] and prices[4] < prices[3] and prices[5] > prices[4]
-    else:
-        ok_impulse &= prices[1] < prices[0] and prices[2] > prices[1] and prices[3] < prices[2] and prices[4] > prices[3] and prices[5] < prices[4]
-
-    if trend_up:
-        ok_correction = prices[6] < prices[5] and prices[7] > prices[6]
-    else:
-        ok_correction = prices[6] > prices[5] and prices[7] < prices[6]
+    if not ok:
+        return {"ok": False, "reason": "no 5 3 pattern", "trend": trend, "labels": []}
 
     labels = ["1","2","3","4","5","A","B","C"]
     return {
-        "ok": bool(ok_impulse and ok_correction),
-        "trend": "up" if trend_up else "down",
-        "labels": [(pts[i].idx, prices[i], labels[i]) for i in range(8)],
+        "ok": True,
+        "trend": trend,
+        "labels": [(pts.idx[i], float(prices[i]), labels[i]) for i in range(8)],
         "points": pts
     }
 
 
-def analyze(ticker: str, period: str = "2y", interval: str = "1d", zigzag_pct: float = 5.0, plot: bool = False) -> Dict[str, object]:
-    df = fetch_data(ticker, period=period, interval=interval)
-    close = df["Close"].dropna()
-    swings = zigzag(close, pct=zigzag_pct)
+def build_report(ticker: str, period: str, interval: str, zigzag_pct: float, close: pd.Series, swings: Swings) -> Dict[str, object]:
     labeling = try_label_5_3(swings)
-
-    report = {
+    return {
         "ticker": ticker,
         "period": period,
         "interval": interval,
@@ -177,33 +526,79 @@ def analyze(ticker: str, period: str = "2y", interval: str = "1d", zigzag_pct: f
         "labels": labeling.get("labels", [])
     }
 
+
+def analyze(ticker: str, period: str = "2y", interval: str = "1d", zigzag_pct: float = 5.0, plot: bool = False,
+            cache_dir: Optional[str] = DEFAULT_CACHE_DIR, df: Optional[pd.DataFrame] = None,
+            session: Optional[curl_requests.Session] = None, cache_zigzag: bool = False) -> Dict[str, object]:
+    """
+    Fetch prices and run the ZigZag and 5 3 labeling for one ticker.
+    Pass df to analyze already downloaded prices instead of fetching them.
+    With cache_zigzag the ZigZag run is cached in cache_dir as well.
+    """
+    if df is None:
+        df = fetch_data(ticker, period=period, interval=interval, cache_dir=cache_dir, session=session)
+    close = df["Close"].dropna()
+    swings = zigzag(close, pct=zigzag_pct, cache_dir=cache_dir if cache_zigzag else None)
+    report = build_report(ticker, period, interval, zigzag_pct, close, swings)
+
     if plot:
-        plt.figure(figsize=(10, 6))
-        plt.plot(close.index, close.values, linewidth=1.2)
-        x = [s.idx for s in swings]
-        y = [s.price for s in swings]
-        plt.scatter(x, y, s=30)
-        for idx, price, lab in labeling.get("labels", []):
-            plt.annotate(lab, xy=(idx, price), xytext=(0, 8), textcoords="offset points", fontsize=9)
-        plt.title(f"{ticker} closes with ZigZag {zigzag_pct} percent and Elliott labels")
-        plt.xlabel("date")
-        plt.ylabel("price")
-        plt.tight_layout()
-        plt.show()
+        plot_analysis(close, swings, report)
 
     return report
 
 
+def plot_analysis(close: pd.Series, swings: Swings, report: Dict[str, object], save_path: Optional[str] = None) -> None:
+    """
+    Chart the closes with ZigZag swings and Elliott labels.
+    Shows the chart, or writes it to save_path and closes the figure.
+    """
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(close.index, close.values, linewidth=1.2)
+    ax.scatter(swings.idx, swings.price, s=30)
+
+    labels = report["labels"]
+    if labels:
+        # Fix the limits first so the labels do not trigger autoscaling
+        ax.autoscale_view()
+        ax.set_autoscale_on(False)
+        xy = np.column_stack([mdates.date2num([idx for idx, _, _ in labels]), [price for _, price, _ in labels]])
+        above = offset_copy(ax.transData, fig=fig, y=8, units="points")
+        with plt.rc_context({"text.usetex": False}):
+            for (x, y), (_, _, lab) in zip(xy, labels):
+                ax.text(x, y, lab, fontsize=9, transform=above)
+
+    ax.set_title(f"{report['ticker']} closes with ZigZag {report['zigzag_pct']} percent and Elliott labels")
+    ax.set_xlabel("date")
+    ax.set_ylabel("price")
+    fig.tight_layout()
+
+    if save_path:
+        try:
+            fig.savefig(save_path)
+        finally:
+            plt.close(fig)
+    else:
+        plt.show()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Heuristic Elliott wave analysis with Yahoo Finance data")
     parser.add_argument("--ticker", type=str, required=True, help="Ticker like AAPL GOOGL PYPL UNH")
     parser.add_argument("--period", type=str, default="2y", help="Range like 6mo 1y 2y 5y max")
     parser.add_argument("--interval", type=str, default="1d", help="Interval like 1d 1h 30m")
-    parser.add_argument("--zigzag", type=float, default=5.0, help="ZigZag threshold in percent")
+    parser.add_argument("--zigzag", type=float, default=5.0, help="ZigZag threshold in percent, must be > 0")
     parser.add_argument("--plot", action="store_true", help="Show chart")
+    parser.add_argument("--cache-dir", type=str, default=DEFAULT_CACHE_DIR, help="Directory for cached downloads")
+    parser.add_argument("--no-cache", action="store_true", help="Always download and recompute")
+    parser.add_argument("--cache-zigzag", action="store_true",
+                        help="Also cache ZigZag runs, only faster without numba or the Cython kernel")
     args = parser.parse_args()
+    if not args.zigzag > 0:
+        parser.error("--zigzag must be a positive percent")
 
-    rep = analyze(args.ticker, period=args.period, interval=args.interval, zigzag_pct=args.zigzag, plot=args.plot)
+    cache_dir = None if args.no_cache else args.cache_dir
+    rep = analyze(args.ticker, period=args.period, interval=args.interval, zigzag_pct=args.zigzag, plot=args.plot,
+                  cache_dir=cache_dir, cache_zigzag=args.cache_zigzag)
     print("=== Report ===")
     print(f"Ticker: {rep['ticker']}")
     print(f"Last price: {rep['last_price']:.2f}")
@@ -10,34 +10,46 @@ Usage:
 """
 
 import argparse
-import csv
+import matplotlib
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import sys
 import os
+from collections import defaultdict
 
 # Import the analyzer functions from the main script
-from elliott_wave_analyzer import analyze
+from elliott_wave_analyzer import fetch_many, make_session, zigzag, zigzag_batch, build_report, plot_analysis, DEFAULT_CACHE_DIR
+
+WAVE_LABELS = ["1", "2", "3", "4", "5", "A", "B", "C"]
+
+# Fixed result schema, one row per stock
+RESULT_COLUMNS = [
+    'ticker', 'last_price', 'period', 'interval', 'zigzag_pct', 'num_swings',
+    'elliott_5_3_match', 'trend', 'analysis_date', 'status',
+] + [f'wave_{label}_{field}' for label in WAVE_LABELS for field in ('date', 'price')]
 
 
 def load_portfolio(csv_file: str) -> list:
-    """Load portfolio from CSV file."""
-    portfolio = []
+    """Load portfolio from CSV file as a list of PortfolioRow namedtuples."""
     try:
-        with open(csv_file, 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                # Handle ticker name corrections
-                ticker = row['ticker']
-                if ticker == 'PALO-ALTO-NETWORKS':
-                    ticker = 'PANW'  # Correct ticker for Palo Alto Networks
-                
-                portfolio.append({
-                    'ticker': ticker,
-                    'period': row['period'],
-                    'interval': row['interval'],
-                    'zigzag': float(row['zigzag'])
-                })
+        df = pd.read_csv(csv_file, dtype={
+            'ticker': 'string',
+            'period': 'string',
+            'interval': 'string',
+            'zigzag': np.float64,
+        })
+        # Empty cells would be pd.NA, which breaks string comparisons and joins
+        df[['ticker', 'period', 'interval']] = df[['ticker', 'period', 'interval']].fillna('')
+        # NaN never triggers a reversal and pct <= 0 is rejected by zigzag, fail the load instead
+        bad = df.index[~(df['zigzag'] > 0)]
+        if len(bad):
+            raise ValueError(f"zigzag must be a positive number, check line {bad[0] + 2} of the file")
+        
+        # Handle ticker name corrections
+        df.loc[df['ticker'] == 'PALO-ALTO-NETWORKS', 'ticker'] = 'PANW'  # Correct ticker for Palo Alto Networks
+        
+        portfolio = list(df[['ticker', 'period', 'interval', 'zigzag']].itertuples(index=False, name='PortfolioRow'))
     except FileNotFoundError:
         print(f"Error: Portfolio file '{csv_file}' not found.")
         sys.exit(1)
@@ -48,53 +60,94 @@ def load_portfolio(csv_file: str) -> list:
     return portfolio
 
 
-def analyze_portfolio(portfolio: list, output_file: str = None) -> pd.DataFrame:
-    """Analyze all stocks in the portfolio."""
-    results = []
+def analyze_portfolio(portfolio: list, output_file: str = None,
+                      cache_dir: str = DEFAULT_CACHE_DIR, plot_dir: str = None,
+                      cache_zigzag: bool = False) -> pd.DataFrame:
+    """
+    Analyze all stocks in the portfolio.
+    Prices are downloaded with one request per (period, interval) group,
+    then the ZigZag of all stocks is computed in a single batch call.
+    If plot_dir is given, a chart per stock is saved there as {ticker}.png,
+    with '/' in the ticker replaced by '_'. A chart that cannot be written
+    is reported but does not fail the stock.
+    With cache_zigzag the ZigZag runs are cached in cache_dir as well.
+    """
+    results = [None] * len(portfolio)
     total_stocks = len(portfolio)
     
     print(f"Analyzing {total_stocks} stocks from portfolio...")
     print("=" * 60)
     
-    for i, stock in enumerate(portfolio, 1):
-        ticker = stock['ticker']
-        period = stock['period']
-        interval = stock['interval']
-        zigzag_pct = stock['zigzag']
+    if plot_dir:
+        os.makedirs(plot_dir, exist_ok=True)
+    
+    # One download per (period, interval) group, yf.download already fetches
+    # the tickers of a group in parallel threads
+    groups = defaultdict(list)
+    for i, stock in enumerate(portfolio):
+        groups[(stock.period, stock.interval)].append(i)
+    
+    closes = {}
+    errors = {}
+    # One HTTP session for all groups, so its connections are reused
+    session = make_session()
+    for (period, interval), members in groups.items():
+        try:
+            frames = fetch_many([portfolio[i].ticker for i in members], period, interval, cache_dir,
+                                session=session)
+        except Exception as e:
+            for i in members:
+                errors[i] = e
+            continue
+        for i in members:
+            ticker = portfolio[i].ticker
+            if ticker in frames:
+                closes[i] = frames[ticker]["Close"].dropna()
+            else:
+                errors[i] = RuntimeError(f"No data for {ticker}")
+    
+    zigzag_cache_dir = cache_dir if cache_zigzag else None
+    fetched = sorted(closes)
+    try:
+        swings = dict(zip(fetched, zigzag_batch([closes[i] for i in fetched], [portfolio[i].zigzag for i in fetched],
+                                                cache_dir=zigzag_cache_dir)))
+    except Exception:
+        # One bad series fails the whole batch, redo them one by one so it only fails its own stock
+        swings = {}
+    
+    for i, stock in enumerate(portfolio):
+        ticker = stock.ticker
+        period = stock.period
+        interval = stock.interval
+        zigzag_pct = stock.zigzag
         
-        print(f"[{i}/{total_stocks}] Analyzing {ticker}...")
+        print(f"[{i + 1}/{total_stocks}] Analyzing {ticker}...")
         
         try:
-            # Run the analysis
-            report = analyze(
-                ticker=ticker,
-                period=period,
-                interval=interval,
-                zigzag_pct=zigzag_pct,
-                plot=False
-            )
-            
-            # Add to results
-            result = {
-                'ticker': ticker,
-                'last_price': report['last_price'],
-                'period': period,
-                'interval': interval,
-                'zigzag_pct': zigzag_pct,
-                'num_swings': report['num_swings'],
-                'elliott_5_3_match': report['elliott_5_3_match'],
-                'trend': report.get('trend', 'N/A'),
-                'analysis_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'status': 'Success'
-            }
+            if i in errors:
+                raise errors[i]
+            stock_swings = swings[i] if i in swings else zigzag(closes[i], zigzag_pct, cache_dir=zigzag_cache_dir)
+            report = build_report(ticker, period, interval, zigzag_pct, closes[i], stock_swings)
             
-            # Add wave labels if available
-            if report['labels']:
-                for idx, (date, price, label) in enumerate(report['labels']):
-                    result[f'wave_{label}_date'] = date.strftime('%Y-%m-%d')
-                    result[f'wave_{label}_price'] = price
+            # Add to results, wave labels if available
+            waves = [None] * (2 * len(WAVE_LABELS))
+            for date, price, label in report['labels']:
+                j = 2 * WAVE_LABELS.index(label)
+                waves[j:j + 2] = date.strftime('%Y-%m-%d'), price
             
-            results.append(result)
+            results[i] = (
+                ticker,
+                report['last_price'],
+                period,
+                interval,
+                zigzag_pct,
+                report['num_swings'],
+                report['elliott_5_3_match'],
+                report.get('trend', 'N/A'),
+                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'Success',
+                *waves,
+            )
             
             # Print summary
             status = "✓ FOUND" if report['elliott_5_3_match'] else "✗ Not found"
@@ -102,25 +155,34 @@ def analyze_portfolio(portfolio: list, output_file: str = None) -> pd.DataFrame:
             print(f"    Elliott 5-3 pattern: {status} {trend_info}")
             print(f"    Last price: ${report['last_price']:.2f}, Swings: {report['num_swings']}")
             
+            if plot_dir:
+                # The analysis is done, a failing chart only gets a warning
+                try:
+                    plot_path = os.path.join(plot_dir, f"{ticker.replace('/', '_')}.png")
+                    plot_analysis(closes[i], stock_swings, report, save_path=plot_path)
+                except Exception as e:
+                    print(f"    ✗ Could not save chart for {ticker}: {str(e)}")
+            
         except Exception as e:
             print(f"    ✗ Error analyzing {ticker}: {str(e)}")
-            results.append({
-                'ticker': ticker,
-                'last_price': 0,
-                'period': period,
-                'interval': interval,
-                'zigzag_pct': zigzag_pct,
-                'num_swings': 0,
-                'elliott_5_3_match': False,
-                'trend': 'Error',
-                'analysis_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'status': f'Error: {str(e)}'
-            })
+            results[i] = (
+                ticker,
+                0,
+                period,
+                interval,
+                zigzag_pct,
+                0,
+                False,
+                'Error',
+                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                f'Error: {str(e)}',
+                *[None] * (2 * len(WAVE_LABELS)),
+            )
         
         print()
     
     # Convert to DataFrame
-    df_results = pd.DataFrame(results)
+    df_results = pd.DataFrame(results, columns=RESULT_COLUMNS)
     
     # Save to CSV if output file specified
     if output_file:
@@ -167,6 +229,14 @@ def main():
                        help="Output CSV file for results (optional)")
     parser.add_argument("--summary-only", action="store_true", 
                        help="Show only summary, not individual stock details")
+    parser.add_argument("--cache-dir", type=str, default=DEFAULT_CACHE_DIR,
+                       help=f"Directory for cached downloads (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Always download and recompute")
+    parser.add_argument("--cache-zigzag", action="store_true",
+                       help="Also cache ZigZag runs, only faster without numba or the Cython kernel")
+    parser.add_argument("--save-plots", type=str, metavar="DIR",
+                       help="Save a chart per stock as PNG into this directory (optional)")
     
     args = parser.parse_args()
     
@@ -174,7 +244,13 @@ def main():
     portfolio = load_portfolio(args.portfolio)
     
     # Analyze portfolio
-    results_df = analyze_portfolio(portfolio, args.output)
+    if args.save_plots:
+        # Render off-screen, no GUI backend is needed to write PNG files
+        matplotlib.use("Agg")
+    
+    cache_dir = None if args.no_cache else args.cache_dir
+    results_df = analyze_portfolio(portfolio, args.output, cache_dir=cache_dir,
+                                   plot_dir=args.save_plots, cache_zigzag=args.cache_zigzag)
     
     # Print summary
     print_summary(results_df)
@@ -0,0 +1,29 @@
+"""
+setup.py
+
+Builds the optional Cython ZigZag kernel next to the scripts:
+    pip install cython
+    python setup.py build_ext --inplace
+
+Without it elliott_wave_analyzer.py uses the numba kernel, or NumPy.
+
+Set EWA_NATIVE=1 to tune the build for the local CPU (-march=native), the
+resulting module then may not run on other machines.
+"""
+
+import os
+
+from Cython.Build import cythonize
+from setuptools import Extension, setup
+
+extra_compile_args = ["-O3"]
+if os.environ.get("EWA_NATIVE") == "1":
+    extra_compile_args.append("-march=native")
+
+setup(
+    name="elliott-wave-analyzer",
+    ext_modules=cythonize(
+        [Extension("_zigzag", ["_zigzag.pyx"], extra_compile_args=extra_compile_args)],
+        compiler_directives={"boundscheck": False, "wraparound": False, "cdivision": True, "language_level": 3},
+    ),
+)